@@ -1,16 +1,84 @@
 import streamlit as st
-st.set_page_config(page_title="Boteval Annotation App", layout="wide")
 
 import json
 import datetime
+import hmac
+import re
 import uuid
-import io
 import os
-from huggingface_hub import HfApi, hf_hub_download
 
-# Load secrets
-hf_token = st.secrets["hf"]["token"]
-HF_REPO_ID = st.secrets["hf"]["repo_id"]
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from huggingface_hub import CommitOperationAdd, HfApi, hf_hub_download
+
+# orjson is a much faster drop-in for encode/decode; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to bytes, optionally pretty-printed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+from pathlib import Path
+
+from huggingface_hub.utils import EntryNotFoundError
+
+# Load secrets once per process instead of re-reading them on every rerun
+@st.cache_resource
+def get_secrets():
+    return {
+        "token": st.secrets["hf"]["token"],
+        "repo_id": st.secrets["hf"]["repo_id"],
+        "users": dict(st.secrets.get("authorized_users", {}))
+    }
+
+_secrets = get_secrets()
+hf_token = _secrets["token"]
+HF_REPO_ID = _secrets["repo_id"]
+
+# Survives process restarts, unlike st.cache_data, so a redeploy does not
+# force a re-download of unchanged files
+_DISK_CACHE_DIR = Path("~/.cache/boteval").expanduser()
+
+def etag_cached_read(filename):
+    """Read a dataset file's bytes via an etag-checked cache on disk.
+
+    One metadata call (get_paths_info) replaces a full download whenever
+    the file is unchanged on the Hub, while edits -- the editor app
+    actively rewrites questions.json -- are picked up as soon as the
+    wrapping cache expires."""
+    path = _DISK_CACHE_DIR / filename
+    meta = path.with_suffix(path.suffix + ".etag")
+    try:
+        etag = get_hf_api().get_paths_info(
+            HF_REPO_ID, filename, repo_type="dataset"
+        )[0].blob_id
+    except Exception:
+        etag = None
+    if etag is not None and meta.exists() and meta.read_text() == etag:
+        return path.read_bytes()
+    local = hf_hub_download(
+        repo_id=HF_REPO_ID,
+        filename=filename,
+        repo_type="dataset",
+        token=hf_token
+    )
+    data = Path(local).read_bytes()
+    if etag is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        meta.write_text(etag)
+    return data
 
 # Initialize session states
 if "authenticated" not in st.session_state:
@@ -22,10 +90,11 @@ if "annotations" not in st.session_state:
 if "session_id" not in st.session_state:
     st.session_state.session_id = None
 
-# Authentication function
+# Authentication function (constant-time comparison to avoid leaking
+# prefix length through timing)
 def authenticate_user(email, password):
-    authorized_users = st.secrets.get("authorized_users", {})
-    return email in authorized_users and authorized_users[email] == password
+    stored = _secrets["users"].get(email)
+    return stored is not None and hmac.compare_digest(str(stored), password)
 
 # Login form
 if not st.session_state.authenticated:
@@ -61,8 +130,8 @@ if st.session_state.session_id is None:
                     repo_type="dataset",
                     token=hf_token
                 )
-                with open(session_file, "r") as f:
-                    session_data = json.load(f)
+                with open(session_file, "rb") as f:
+                    session_data = json_loads(f.read())
                 st.session_state.session_id = session_id
                 st.session_state.annotations = session_data.get("annotations", {})
                 st.success("Session loaded successfully!")
@@ -77,29 +146,45 @@ if st.session_state.session_id is None:
             st.info("Please save this session ID to continue your work later.")
             st.rerun()
 
-hf_api = HfApi(token=hf_token)
+# Reuse one HfApi client (and its HTTP connection pool) across reruns
+@st.cache_resource
+def get_hf_api():
+    return HfApi(token=hf_token)
 
-# Load questions.json dynamically
-questions_file_path = hf_hub_download(
-    repo_id=HF_REPO_ID,
-    filename="questions.json",
-    repo_type="dataset",
-    token=hf_token
-)
+hf_api = get_hf_api()
 
-with open(questions_file_path, "r") as f:
-    questions = json.load(f)
+# Load questions.json dynamically (cached so reruns skip the download and parse)
+@st.cache_data(ttl=300)
+def load_questions():
+    questions = json_loads(etag_cached_read("questions.json"))
 
-# Extract all unique topics
-topics_set = set()
-for q in questions:
-    topics = q.get("topic", [])
-    if topics:
-        topics_set.update(topics)
-    else:
-        topics_set.add("None")
+    # Extract all unique topics
+    topics_set = set()
+    for q in questions:
+        topics = q.get("topic", [])
+        if topics:
+            topics_set.update(topics)
+        else:
+            topics_set.add("None")
+
+    return questions, sorted(topics_set)
+
+questions, topics_list = load_questions()
 
-topics_list = sorted(list(topics_set))
+# Index questions by topic once so selecting a topic is a dict lookup
+# instead of a rerun-time scan over all questions
+@st.cache_data
+def build_topic_index(questions):
+    index = {
+        "All Topics": questions,
+        "None": [q for q in questions if not q.get("topic")]
+    }
+    for q in questions:
+        for topic in q.get("topic") or []:
+            index.setdefault(topic, []).append(q)
+    return index
+
+topic_index = build_topic_index(questions)
 
 st.title("LLM Question Annotation")
 
@@ -123,105 +208,155 @@ selected_topic = st.radio(
 )
 
 # Filter questions based on topic selection
-if selected_topic == "All Topics":
-    questions_to_annotate = questions
-else:
-    if selected_topic == "None":
-        questions_to_annotate = [q for q in questions if not q.get("topic")]
-    else:
-        questions_to_annotate = [
-            q for q in questions if selected_topic in q.get("topic", [])
-        ]
+questions_to_annotate = topic_index[selected_topic]
 
 st.divider()
 
-# Annotation loop
-for q in questions_to_annotate:
-    qid = q["id"]
-    st.subheader(f"Question ID: {qid}")
-    
-    # Display question and answer
-    st.markdown("**Question:**")
-    st.markdown(q['question'])
-    st.markdown("**Answer:**")
-    st.markdown(q['answer'])
-
-    # Question quality rating
-    st.markdown("**Question Quality Rating:**")
-    question_quality = st.radio(
-        f"Rate the question quality",
-        options=[-1, 0, 1],
-        format_func=lambda x: { -1: "Poor (-1)", 0: "Neutral (0)", 1: "Good (+1)" }[x],
-        index=1,
-        key=f"q_quality_{qid}"
-    )
+# Paginate so only one page of widgets is materialized per rerun; annotations
+# for other pages stay in st.session_state
+PAGE_SIZE = 20
+num_pages = max(1, (len(questions_to_annotate) + PAGE_SIZE - 1) // PAGE_SIZE)
+page = st.number_input("Page", min_value=1, max_value=num_pages, value=1)
+st.caption(f"Page {page} of {num_pages} ({len(questions_to_annotate)} questions)")
+questions_on_page = questions_to_annotate[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+# Annotation loop, batched in a form: widget edits no longer trigger a full
+# script rerun per keystroke, only the submit does
+with st.form("annotation_form"):
+    for q in questions_on_page:
+        qid = q["id"]
+        st.subheader(f"Question ID: {qid}")
+
+        # Display question and answer
+        st.markdown("**Question:**")
+        st.markdown(q['question'])
+        st.markdown("**Answer:**")
+        st.markdown(q['answer'])
+
+        # Seed every widget from the saved annotations: pagination drops
+        # widget state for unrendered pages, so defaults here would show
+        # (and on resubmit, silently save) Neutral over earlier ratings
+        saved = st.session_state.annotations.get(qid, {})
+
+        # Question quality rating
+        st.markdown("**Question Quality Rating:**")
+        st.radio(
+            f"Rate the question quality",
+            options=[-1, 0, 1],
+            format_func=lambda x: { -1: "Poor (-1)", 0: "Neutral (0)", 1: "Good (+1)" }[x],
+            index=saved.get("question_quality", 0) + 1,
+            key=f"q_quality_{qid}"
+        )
 
-    # Answer quality rating
-    st.markdown("**Answer Quality Rating:**")
-    answer_quality = st.radio(
-        f"Rate the answer quality",
-        options=[-1, 0, 1],
-        format_func=lambda x: { -1: "Poor (-1)", 0: "Neutral (0)", 1: "Good (+1)" }[x],
-        index=1,
-        key=f"a_quality_{qid}"
-    )
+        # Answer quality rating
+        st.markdown("**Answer Quality Rating:**")
+        st.radio(
+            f"Rate the answer quality",
+            options=[-1, 0, 1],
+            format_func=lambda x: { -1: "Poor (-1)", 0: "Neutral (0)", 1: "Good (+1)" }[x],
+            index=saved.get("answer_quality", 0) + 1,
+            key=f"a_quality_{qid}"
+        )
 
-    # Comments field
-    comments = st.text_area(
-        "Additional Comments",
-        value=st.session_state.annotations.get(qid, {}).get("comments", ""),
-        key=f"comments_{qid}"
-    )
+        # Comments field
+        st.text_area(
+            "Additional Comments",
+            value=saved.get("comments", ""),
+            key=f"comments_{qid}"
+        )
 
-    # Store current question's annotations
-    current_annotations = {
-        "question_quality": question_quality,
-        "answer_quality": answer_quality,
-        "comments": comments
-    }
-    st.session_state.annotations[qid] = current_annotations
+        st.divider()
 
-    # Submit button for individual question
-    if st.button(f"Submit Annotations for {qid}", key=f"submit_{qid}"):
-        timestamp = datetime.datetime.now().isoformat().replace(":", "-")
-        file_id = str(uuid.uuid4())
-        filename = f"annotate/annotation-{timestamp}-{file_id}.json"
+    submitted = st.form_submit_button("Submit Annotations")
 
-        submission = {
-            "session_id": st.session_state.session_id,
-            "annotator": annotator,
-            "timestamp": timestamp,
-            "topic": selected_topic,
-            "question_id": qid,
-            "annotations": {qid: current_annotations}
+if submitted:
+    # Collect the committed widget values for every question in the form
+    submitted_annotations = {}
+    for q in questions_on_page:
+        qid = q["id"]
+        submitted_annotations[qid] = {
+            "question_quality": st.session_state[f"q_quality_{qid}"],
+            "answer_quality": st.session_state[f"a_quality_{qid}"],
+            "comments": st.session_state[f"comments_{qid}"]
         }
+    st.session_state.annotations.update(submitted_annotations)
+
+    timestamp = datetime.datetime.now().isoformat().replace(":", "-")
+
+    submission = {
+        "session_id": st.session_state.session_id,
+        "annotator": annotator,
+        "timestamp": timestamp,
+        "topic": selected_topic,
+        "annotations": submitted_annotations
+    }
 
-        submission_json = json.dumps(submission, indent=2)
-        hf_api.upload_file(
-            path_or_fileobj=io.BytesIO(submission_json.encode()),
-            path_in_repo=filename,
+    # Append to a rolling daily JSONL shard instead of writing one tiny
+    # JSON file per submission, so readers fetch a handful of shards
+    # rather than thousands of files. One shard per annotator: the
+    # read-modify-write below would lose lines if two annotators appended
+    # to the same file concurrently
+    annotator_slug = re.sub(r"[^A-Za-z0-9_-]", "_", annotator)
+    shard_name = (
+        f"annotate/annotations-{datetime.date.today().strftime('%Y%m%d')}"
+        f"-{annotator_slug}.jsonl"
+    )
+    try:
+        shard_path = hf_hub_download(
             repo_id=HF_REPO_ID,
-            repo_type="dataset"
+            filename=shard_name,
+            repo_type="dataset",
+            token=hf_token
+        )
+        with open(shard_path, "r") as f:
+            shard_content = f.read()
+    except EntryNotFoundError:
+        # First submission of the day for this annotator
+        shard_content = ""
+    except Exception as e:
+        # Any other failure (network, auth) must fail the submit: falling
+        # back to an empty shard here would commit away every line already
+        # recorded today
+        st.error(f"Could not read today's annotation shard: {e}")
+        st.stop()
+    shard_content += json_dumps(submission).decode() + "\n"
+
+    operations = [
+        CommitOperationAdd(
+            path_in_repo=shard_name,
+            path_or_fileobj=shard_content.encode()
         )
+    ]
 
-        # Save session state
+    # Debounce the session snapshot: it re-uploads every annotation made so
+    # far, so writing it on every submit costs O(N^2) bytes over a session.
+    # Include it only every few submits; "Save Current Session" always writes.
+    st.session_state.submits_since_session_save = (
+        st.session_state.get("submits_since_session_save", 0) + 1
+    )
+    if st.session_state.submits_since_session_save >= 5:
         session_data = {
             "session_id": st.session_state.session_id,
             "annotator": annotator,
             "last_updated": timestamp,
             "annotations": st.session_state.annotations
         }
-        session_json = json.dumps(session_data, indent=2)
-        hf_api.upload_file(
-            path_or_fileobj=io.BytesIO(session_json.encode()),
+        operations.append(CommitOperationAdd(
             path_in_repo=f"annotate/session-{st.session_state.session_id}.json",
-            repo_id=HF_REPO_ID,
-            repo_type="dataset"
-        )
+            path_or_fileobj=json_dumps(session_data)
+        ))
+        st.session_state.submits_since_session_save = 0
 
-        st.success(f"Annotations for {qid} submitted successfully!")
+    # One commit for everything: a single network round-trip instead of
+    # one upload_file call per file
+    hf_api.create_commit(
+        repo_id=HF_REPO_ID,
+        repo_type="dataset",
+        operations=operations,
+        commit_message=f"Annotation submission {timestamp}"
+    )
 
-    st.divider()
+    st.success("Annotations submitted successfully!")
 
 # Save session button
 if st.button("Save Current Session"):
@@ -232,9 +367,9 @@ if st.button("Save Current Session"):
         "last_updated": timestamp,
         "annotations": st.session_state.annotations
     }
-    session_json = json.dumps(session_data, indent=2)
+    session_json = json_dumps(session_data)
     hf_api.upload_file(
-        path_or_fileobj=io.BytesIO(session_json.encode()),
+        path_or_fileobj=session_json,
         path_in_repo=f"annotate/session-{st.session_state.session_id}.json",
         repo_id=HF_REPO_ID,
         repo_type="dataset"
@@ -1,6 +1,16 @@
 import streamlit as st
+import hmac
 import os
 
+# Use the Rust-based downloader in the component apps; must be set before
+# huggingface_hub is imported anywhere
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+# Keep the Hub cache on persistent storage when the deploy target mounts
+# /data, so process restarts reuse downloaded files instead of refetching
+if os.path.isdir("/data"):
+    os.environ.setdefault("HF_HOME", "/data/hf_cache")
+
 st.set_page_config(
     page_title="Boteval Master App",
     page_icon="🤖",
@@ -11,17 +21,24 @@ st.set_page_config(
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
-# Authentication function
+# Load the user table once per process instead of re-reading secrets on
+# every rerun
+@st.cache_resource
+def get_authorized_users():
+    return dict(st.secrets.get("authorized_users", {}))
+
+# Authentication function (constant-time comparison to avoid leaking
+# prefix length through timing)
 def authenticate_user(email, password):
-    authorized_users = st.secrets.get("authorized_users", {})
-    return email in authorized_users and authorized_users[email] == password
+    stored = get_authorized_users().get(email)
+    return stored is not None and hmac.compare_digest(str(stored), password)
 
 # Login form
 if not st.session_state.authenticated:
     st.title("Boteval Login")
     email = st.text_input("Email")
     password = st.text_input("Password", type="password")
-    
+
     if st.button("Login"):
         if authenticate_user(email, password):
             st.session_state.authenticated = True
@@ -31,54 +48,76 @@ if not st.session_state.authenticated:
             st.error("Invalid email or password")
     st.stop()
 
-# Main app content
-st.title("🤖 Boteval Master App")
-st.markdown("Welcome to the Boteval platform! Select a component below to get started.")
-
-# Create columns for the app cards
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("### Data Collection & Management")
-    
-    # Gather App
-    st.markdown("#### 📝 Response Collector")
-    st.markdown("Collect and manage LLM responses for evaluation.")
-    if st.button("Launch Response Collector", key="gather"):
-        os.system("streamlit run gather/app.py")
-    
-    # Prompts App
-    st.markdown("#### 💭 Prompt Manager")
-    st.markdown("Create and manage system prompts for LLMs.")
-    if st.button("Launch Prompt Manager", key="prompts"):
-        os.system("streamlit run prompts/app.py")
-    
-    # Editor App
-    st.markdown("#### ✏️ Response Editor")
-    st.markdown("Edit and refine LLM responses.")
-    if st.button("Launch Response Editor", key="editor"):
-        os.system("streamlit run editor/app.py")
-
-with col2:
-    st.markdown("### Evaluation & Analysis")
-    
-    # Compare App
-    st.markdown("#### 🔄 Response Comparison")
-    st.markdown("Compare different LLM responses side by side.")
-    if st.button("Launch Response Comparison", key="compare"):
-        os.system("streamlit run compare/app.py")
-    
-    # Annotate App
-    st.markdown("#### 📋 Annotation Tool")
-    st.markdown("Annotate and evaluate LLM responses.")
-    if st.button("Launch Annotation Tool", key="annotate"):
-        os.system("streamlit run annotate/app.py")
-    
-    # Visualize App
-    st.markdown("#### 📊 Evaluation Visualization")
-    st.markdown("Visualize and analyze evaluation results.")
-    if st.button("Launch Visualization", key="visualize"):
-        os.system("streamlit run visualize/app.py")
+# Component apps as pages of this process: navigation reuses imports,
+# session state (auth) and cached data instead of forking a new
+# interpreter per launch. Explicit url_path throughout: every script is
+# named app.py, and the inferred path (the filename stem) must be unique
+# or st.navigation refuses to start
+gather_page = st.Page("gather/app.py", title="Response Collector", icon="📝", url_path="gather")
+prompts_page = st.Page("prompts/app.py", title="Prompt Manager", icon="💭", url_path="prompts")
+editor_page = st.Page("editor/app.py", title="Response Editor", icon="✏️", url_path="editor")
+compare_page = st.Page("compare/app.py", title="Response Comparison", icon="🔄", url_path="compare")
+annotate_page = st.Page("annotate/app.py", title="Annotation Tool", icon="📋", url_path="annotate")
+visualize_page = st.Page("visualize/app.py", title="Evaluation Visualization", icon="📊", url_path="visualize")
+
+def home():
+    st.title("🤖 Boteval Master App")
+    st.markdown("Welcome to the Boteval platform! Select a component below to get started.")
+
+    # Create columns for the app cards
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### Data Collection & Management")
+
+        # Gather App
+        st.markdown("#### 📝 Response Collector")
+        st.markdown("Collect and manage LLM responses for evaluation.")
+        if st.button("Launch Response Collector", key="gather"):
+            st.switch_page(gather_page)
+
+        # Prompts App
+        st.markdown("#### 💭 Prompt Manager")
+        st.markdown("Create and manage system prompts for LLMs.")
+        if st.button("Launch Prompt Manager", key="prompts"):
+            st.switch_page(prompts_page)
+
+        # Editor App
+        st.markdown("#### ✏️ Response Editor")
+        st.markdown("Edit and refine LLM responses.")
+        if st.button("Launch Response Editor", key="editor"):
+            st.switch_page(editor_page)
+
+    with col2:
+        st.markdown("### Evaluation & Analysis")
+
+        # Compare App
+        st.markdown("#### 🔄 Response Comparison")
+        st.markdown("Compare different LLM responses side by side.")
+        if st.button("Launch Response Comparison", key="compare"):
+            st.switch_page(compare_page)
+
+        # Annotate App
+        st.markdown("#### 📋 Annotation Tool")
+        st.markdown("Annotate and evaluate LLM responses.")
+        if st.button("Launch Annotation Tool", key="annotate"):
+            st.switch_page(annotate_page)
+
+        # Visualize App
+        st.markdown("#### 📊 Evaluation Visualization")
+        st.markdown("Visualize and analyze evaluation results.")
+        if st.button("Launch Visualization", key="visualize"):
+            st.switch_page(visualize_page)
+
+navigation = st.navigation([
+    st.Page(home, title="Home", icon="🏠", default=True),
+    gather_page,
+    prompts_page,
+    editor_page,
+    compare_page,
+    annotate_page,
+    visualize_page
+])
 
 # Add logout button in sidebar
 if st.sidebar.button("Logout"):
@@ -86,4 +125,6 @@ if st.sidebar.button("Logout"):
     st.rerun()
 
 # Add user info in sidebar
-st.sidebar.markdown(f"Logged in as: {st.session_state.user_email}") 
\ No newline at end of file
+st.sidebar.markdown(f"Logged in as: {st.session_state.user_email}")
+
+navigation.run()
@@ -0,0 +1,88 @@
+"""Shared Hugging Face I/O helpers for the compare app.
+
+huggingface_hub (which pulls in requests, filelock, etc.) is imported
+lazily on first use, so reruns that stop at the login form never pay
+its import cost.
+"""
+import json
+from pathlib import Path
+
+import streamlit as st
+
+# orjson is a much faster drop-in for encode/decode; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to bytes, optionally pretty-printed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+def _hub():
+    import huggingface_hub
+    return huggingface_hub
+
+# Load secrets once per process instead of re-reading them on every rerun
+@st.cache_resource
+def get_secrets():
+    return {
+        "token": st.secrets["hf"]["token"],
+        "repo_id": st.secrets["hf"]["repo_id"],
+        "users": dict(st.secrets.get("authorized_users", {}))
+    }
+
+# Reuse one HfApi client (and its HTTP connection pool) across reruns
+@st.cache_resource
+def get_api():
+    return _hub().HfApi(token=get_secrets()["token"])
+
+def hub_download(filename):
+    """Download a dataset file and return its local path."""
+    hub = _hub()
+    secrets = get_secrets()
+    return hub.hf_hub_download(
+        repo_id=secrets["repo_id"],
+        filename=filename,
+        repo_type="dataset",
+        token=secrets["token"]
+    )
+
+# Survives process restarts, unlike st.cache_data, so a redeploy does not
+# force a full re-download of every session file
+_DISK_CACHE_DIR = Path("~/.cache/boteval").expanduser()
+
+def _disk_cached_read(filename):
+    """Read a dataset file's bytes via an etag-checked cache on disk.
+
+    One metadata call (get_paths_info) replaces a full download whenever
+    the file is unchanged on the Hub; on mismatch or any API error the
+    normal download path runs.
+    """
+    path = _DISK_CACHE_DIR / filename
+    meta = path.with_suffix(path.suffix + ".etag")
+    try:
+        etag = get_api().get_paths_info(
+            get_secrets()["repo_id"], filename, repo_type="dataset"
+        )[0].blob_id
+    except Exception:
+        etag = None
+    if etag is not None and meta.exists() and meta.read_text() == etag:
+        return path.read_bytes()
+    data = Path(hub_download(filename)).read_bytes()
+    if etag is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        meta.write_text(etag)
+    return data
+
+def load_json(filename):
+    """Download a dataset file and parse it as JSON."""
+    return json_loads(_disk_cached_read(filename))
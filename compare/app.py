@@ -1,13 +1,33 @@
 import streamlit as st
+import hmac
 import json
-import io
-from huggingface_hub import HfApi, hf_hub_download
-import glob
 import os
+import re
+import sys
 
-# Load secrets
-hf_token = st.secrets["hf"]["token"]
-HF_REPO_ID = st.secrets["hf"]["repo_id"]
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Resolve the shared helpers both when run standalone and under the master
+# app's st.navigation, where the working directory is the repo root.
+# Guarded: this module re-executes on every rerun, and unconditional
+# inserts grow sys.path for the life of the process
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
+from _hf_io import get_api, get_secrets, json_dumps, json_loads, load_json
+
+_secrets = get_secrets()
+HF_REPO_ID = _secrets["repo_id"]
+
+# Worker count for fan-out Hub downloads, tunable per deployment
+HF_PARALLEL_WORKERS = int(os.getenv("HF_PARALLEL_WORKERS", "16"))
+
+# Compiled once; filter() with a C-level callable beats a per-file
+# startswith comprehension when the repo listing runs to thousands of files
+_SESSION_FILE_MATCH = re.compile(r"gather/session-").match
 
 # Initialize authentication state
 if "authenticated" not in st.session_state:
@@ -15,8 +35,11 @@ if "authenticated" not in st.session_state:
 
 # Authentication function
 def authenticate_user(email, password):
-    authorized_users = st.secrets.get("authorized_users", {})
-    return email in authorized_users and authorized_users[email] == password
+    stored = _secrets["users"].get(email)
+    if stored is None:
+        return False
+    # Constant-time compare so timing can't leak how much of a password matched
+    return hmac.compare_digest(str(stored), password)
 
 # Login form
 if not st.session_state.authenticated:
@@ -33,127 +56,155 @@ if not st.session_state.authenticated:
             st.error("Invalid email or password")
     st.stop()
 
-# Initialize Hugging Face API client
-hf_api = HfApi(token=hf_token)
+hf_api = get_api()
 
-# Set page config
-st.set_page_config(page_title="Boteval Comparison Tool", layout="wide")
 st.title("LLM Response Comparison Tool")
 
-# Function to load questions
-@st.cache_data(ttl=60)
+# Function to load questions. cache_resource shares the one parsed object
+# across all sessions (callers must treat it as read-only) instead of
+# re-downloading per user session every minute
+@st.cache_resource(ttl=3600)
 def load_questions():
-    questions_file_path = hf_hub_download(
-        repo_id=HF_REPO_ID,
-        filename="questions.json",
-        repo_type="dataset",
-        token=hf_token
-    )
-    with open(questions_file_path, "r") as f:
-        return json.load(f)
+    return load_json("questions.json")
+
+# Per-file cache: when the listing picks up new session files, only those
+# are actually downloaded; files seen before are served from the cache
+@st.cache_data(ttl=300)
+def load_session_file(filename):
+    return load_json(filename)
+
+# One cached repo listing shared by every loader that needs it, instead of a
+# repo-wide API call per loader per rerun
+@st.cache_data(ttl=60)
+def list_files():
+    return hf_api.list_repo_files(repo_id=HF_REPO_ID, repo_type="dataset")
 
 # Function to load session metadata
 @st.cache_data(ttl=60)
 def load_session_metadata():
-    sessions = []
-    # List all files in the gather directory
-    files = hf_api.list_repo_files(repo_id=HF_REPO_ID, repo_type="dataset")
-    session_files = [f for f in files if f.startswith("gather/session-")]
-    
-    for file in session_files:
+    # Fast path: the gather app maintains gather/index.json, a manifest of
+    # session files -- sessions it covers cost one fetch total instead of
+    # a download each
+    try:
+        sessions = load_json("gather/index.json")
+    except Exception:
+        sessions = []
+    indexed = {s.get("filename") for s in sessions}
+
+    # Union with the listing: sessions written before the manifest existed
+    # (or by writers that skip it) are still fetched individually, so a
+    # young index never hides historical session files
+    session_files = [
+        f for f in filter(_SESSION_FILE_MATCH, list_files()) if f not in indexed
+    ]
+
+    errors = []
+
+    def fetch(file):
         try:
-            file_path = hf_hub_download(
-                repo_id=HF_REPO_ID,
-                filename=file,
-                repo_type="dataset",
-                token=hf_token
-            )
-            with open(file_path, "r") as f:
-                session_data = json.load(f)
-                sessions.append({
-                    "session_id": session_data["session_id"],
-                    "metadata": session_data["metadata"],
-                    "last_updated": session_data["last_updated"],
-                    "filename": file
-                })
+            session_data = load_session_file(file)
+            return {
+                "session_id": session_data["session_id"],
+                "metadata": session_data["metadata"],
+                "last_updated": session_data["last_updated"],
+                "filename": file
+            }
         except Exception as e:
-            st.warning(f"Could not load session file {file}: {str(e)}")
-    
+            errors.append((file, str(e)))
+            return None
+
+    # Downloads are network-bound, so fan them out instead of paying one
+    # round-trip per file
+    with ThreadPoolExecutor(max_workers=HF_PARALLEL_WORKERS) as executor:
+        sessions += [s for s in executor.map(fetch, session_files) if s is not None]
+
+    for file, error in errors:
+        st.warning(f"Could not load session file {file}: {error}")
+
     return sessions
 
-# Function to load responses from selected sessions
-@st.cache_data(ttl=60)
-def load_responses_from_sessions(selected_sessions):
-    responses = []
-    for session in selected_sessions:
+# Inner loader keyed on a sorted tuple of filenames: tuples of strings hash
+# instantly, whereas hashing the full session dicts (with nested metadata)
+# forced spurious cache misses whenever any field changed
+@st.cache_data(ttl=300)
+def _load_responses_by_filenames(filenames):
+    errors = []
+
+    def fetch(filename):
         try:
-            file_path = hf_hub_download(
-                repo_id=HF_REPO_ID,
-                filename=session["filename"],
-                repo_type="dataset",
-                token=hf_token
-            )
-            with open(file_path, "r") as f:
-                session_data = json.load(f)
-                responses.append({
-                    "session_id": session_data["session_id"],
-                    "metadata": session_data["metadata"],
-                    "responses": session_data["responses"]
-                })
+            session_data = load_session_file(filename)
+            return {
+                "session_id": session_data["session_id"],
+                "metadata": session_data["metadata"],
+                "responses": session_data["responses"]
+            }
         except Exception as e:
-            st.warning(f"Could not load session {session['session_id']}: {str(e)}")
-    
+            errors.append((filename, str(e)))
+            return None
+
+    with ThreadPoolExecutor(max_workers=HF_PARALLEL_WORKERS) as executor:
+        responses = [r for r in executor.map(fetch, filenames) if r is not None]
+
+    for filename, error in errors:
+        st.warning(f"Could not load session file {filename}: {error}")
+
     return responses
 
-# Function to load evaluation schema
-@st.cache_data(ttl=60)
+# Function to load responses from selected sessions
+def load_responses_from_sessions(selected_sessions):
+    filenames = tuple(sorted(s["filename"] for s in selected_sessions))
+    return _load_responses_by_filenames(filenames)
+
+# Function to load evaluation schema; shared across sessions like the
+# questions, since the schema rarely changes
+@st.cache_resource(ttl=3600)
 def load_evaluation_schema():
     try:
-        schema_file_path = hf_hub_download(
-            repo_id=HF_REPO_ID,
-            filename="evaluation.json",
-            repo_type="dataset",
-            token=hf_token
-        )
-        with open(schema_file_path, "r") as f:
-            return json.load(f)
+        return load_json("evaluation.json")
     except Exception as e:
         st.warning(f"Could not load evaluation schema: {str(e)}")
         return None
 
+# The evaluation schema is an example document with '?'-prefixed optional
+# keys, not JSON Schema, so compiled validators like fastjsonschema do not
+# apply. Build an iterative walker once per schema instead of re-creating
+# the recursive closure (and a Python frame per node) on every validation.
+@st.cache_resource
+def get_validator(schema_json):
+    schema = json_loads(schema_json)
+
+    def validate(data):
+        stack = [(data, schema, "")]
+        while stack:
+            node, node_schema, path = stack.pop()
+            if isinstance(node_schema, dict):
+                # Check required fields from schema; '?' marks optional ones
+                for field, field_schema in node_schema.items():
+                    is_optional = field.startswith('?')
+                    field_name = field[1:] if is_optional else field
+
+                    if field_name not in node:
+                        if not is_optional:
+                            return False, f"Missing required field at {path}: {field_name}"
+                        continue
+
+                    stack.append((node[field_name], field_schema, f"{path}.{field_name}"))
+            elif isinstance(node_schema, list) and len(node_schema) > 0:
+                # For arrays, validate each item against the first schema item
+                if not isinstance(node, list):
+                    return False, f"Expected array at {path}"
+                item_schema = node_schema[0]
+                for i, item in enumerate(node):
+                    stack.append((item, item_schema, f"{path}[{i}]"))
+        return True, "Validation successful"
+
+    return validate
+
 # Function to validate evaluation data against schema
 def validate_evaluation_data(data, schema):
     if not schema:
         return True, "No schema available for validation"
-    
-    def validate_against_schema(data, schema, path=""):
-        if isinstance(schema, dict):
-            # Check required fields from schema
-            for field, field_schema in schema.items():
-                # Skip validation if field is marked as optional (starts with '?')
-                is_optional = field.startswith('?')
-                field_name = field[1:] if is_optional else field
-                
-                if field_name not in data:
-                    if not is_optional:
-                        return False, f"Missing required field at {path}: {field_name}"
-                    continue
-                
-                # Recursively validate nested structure
-                is_valid, message = validate_against_schema(data[field_name], field_schema, f"{path}.{field_name}")
-                if not is_valid:
-                    return False, message
-        elif isinstance(schema, list) and len(schema) > 0:
-            # For arrays, validate each item against the first schema item
-            if not isinstance(data, list):
-                return False, f"Expected array at {path}"
-            for i, item in enumerate(data):
-                is_valid, message = validate_against_schema(item, schema[0], f"{path}[{i}]")
-                if not is_valid:
-                    return False, message
-        return True, "Validation successful"
-    
-    return validate_against_schema(data, schema)
+    return get_validator(json_dumps(schema))(data)
 
 # Load questions and session metadata
 questions = load_questions()
@@ -175,8 +226,15 @@ selected_session_keys = st.multiselect(
     format_func=lambda x: x
 )
 
-# Load responses from selected sessions
 selected_sessions = [session_options[key] for key in selected_session_keys]
+
+# Nothing selected yet: skip the downloads and comparison build entirely
+# instead of grinding through them to render an empty page
+if not selected_sessions:
+    st.info("Select one or more sessions above to build a comparison.")
+    st.stop()
+
+# Load responses from selected sessions
 responses = load_responses_from_sessions(selected_sessions)
 
 # Store the selected session IDs in session state
@@ -190,34 +248,46 @@ comparison_data = {
     "items": []
 }
 
+# Flatten responses into one row per (question, session), grouped by
+# question id in a single pass instead of rescanning every session for
+# every question
+responses_by_qid = {}
+for response in responses:
+    metadata = response["metadata"]
+    for qid, response_text in response["responses"].items():
+        responses_by_qid.setdefault(qid, []).append({
+            "model_name": metadata["model_name"],
+            "run_id": metadata["run_id"],
+            "operator": metadata["operator"],
+            "session_id": response["session_id"],
+            "response": response_text
+        })
+
+# Hoist the attribute lookups out of the per-question loop
+append_item = comparison_data["items"].append
+get_responses = responses_by_qid.get
+
 for question in questions:
     qid = question["id"]
-    q_data = {
+    append_item({
         "id": qid,
         "question": question["question"],
         "answer": question.get("answer", ""),
         "topic": question.get("topic", []),
-        "responses": []
-    }
-    
-    # Add responses from selected sessions
-    for response in responses:
-        if qid in response["responses"]:
-            q_data["responses"].append({
-                "model_name": response["metadata"]["model_name"],
-                "run_id": response["metadata"]["run_id"],
-                "operator": response["metadata"]["operator"],
-                "session_id": response["session_id"],
-                "response": response["responses"][qid]
-            })
-    
-    comparison_data["items"].append(q_data)
+        "responses": get_responses(qid, [])
+    })
 
 # Display the data
 st.header("Comparison Data")
 
+# Serialize once per distinct comparison instead of re-dumping the whole
+# structure on every widget interaction
+@st.cache_data
+def comparison_to_json(data):
+    return json_dumps(data, indent=True)
+
 # Add a download button for the JSON
-json_str = json.dumps(comparison_data, indent=2)
+json_str = comparison_to_json(comparison_data)
 st.download_button(
     label="Download Comparison Data (JSON)",
     data=json_str,
@@ -225,6 +295,30 @@ st.download_button(
     mime="application/json"
 )
 
+# ijson lets large uploads be parsed incrementally, one top-level value at
+# a time, instead of materializing raw bytes and parsed tree side by side
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Below this size the one-shot orjson parse is faster than streaming
+STREAM_PARSE_THRESHOLD = 1 << 20  # 1 MB
+
+def parse_uploaded_json(uploaded_file):
+    size = getattr(uploaded_file, "size", None)
+    if ijson is None or size is None or size < STREAM_PARSE_THRESHOLD:
+        return json_loads(uploaded_file.read())
+    # kvitems only understands a top-level object; anything else (e.g. a
+    # top-level array) silently streams to {}. Peek at the first
+    # non-whitespace byte and take the one-shot parse for other shapes,
+    # which also surfaces malformed input as a normal parse error
+    head = uploaded_file.read(64)
+    uploaded_file.seek(0)
+    if head.lstrip()[:1] != b"{":
+        return json_loads(uploaded_file.read())
+    return {key: value for key, value in ijson.kvitems(uploaded_file, "")}
+
 # Add file upload and JSON paste functionality
 st.header("Upload or Paste Evaluation Results")
 uploaded_file = st.file_uploader("Upload JSON file with evaluation results", type=['json'])
@@ -253,8 +347,7 @@ def upload_to_hf(data):
             data["session_id"] = session_id
         
         # Convert data to JSON string and then to bytes
-        json_str = json.dumps(data, indent=2)
-        json_bytes = json_str.encode('utf-8')
+        json_bytes = json_dumps(data, indent=True)
         
         # Upload to HF using bytes
         hf_api.upload_file(
@@ -270,7 +363,7 @@ def upload_to_hf(data):
 uploaded_data = None
 if uploaded_file is not None:
     try:
-        uploaded_data = json.load(uploaded_file)
+        uploaded_data = parse_uploaded_json(uploaded_file)
         # Validate against schema if available
         if evaluation_schema:
             is_valid, message = validate_evaluation_data(uploaded_data, evaluation_schema)
@@ -290,7 +383,7 @@ if uploaded_file is not None or json_text:
                 data_to_upload = uploaded_data
             else:
                 # Parse the pasted JSON text
-                data_to_upload = json.loads(json_text)
+                data_to_upload = json_loads(json_text)
             
             # Validate against evaluation schema if available
             if evaluation_schema:
@@ -306,7 +399,7 @@ if uploaded_file is not None or json_text:
                 st.success(f"Successfully uploaded evaluation to {result}")
             else:
                 st.error(f"Failed to upload evaluation: {result}")
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, ValueError):
             st.error("Invalid JSON format in pasted text")
         except Exception as e:
             st.error(f"Error processing data: {str(e)}")
@@ -315,8 +408,16 @@ st.divider()
 st.markdown("### 📋 Detailed Item Inspection (FYI Only)")
 st.markdown("Below you can inspect individual questions and responses in detail. This view is for reference purposes only.")
 
+# Even collapsed expanders cost a widget tree each, so render one page at
+# a time instead of every question on every rerun
+INSPECT_PAGE_SIZE = 20
+
+items = comparison_data["items"]
+num_pages = max(1, (len(items) + INSPECT_PAGE_SIZE - 1) // INSPECT_PAGE_SIZE)
+page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1)
+
 # Display the data in an expandable format
-for q_data in comparison_data["items"]:
+for q_data in items[(page - 1) * INSPECT_PAGE_SIZE:page * INSPECT_PAGE_SIZE]:
     with st.expander(f"{q_data['id']}: {q_data['question'][:100]}..."):
         # Display metadata for all responses at the top
         if q_data["responses"]:
@@ -1,9 +1,32 @@
 import streamlit as st
+import hmac
 import json
-import io
+import os
+
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from huggingface_hub import HfApi, hf_hub_download
 import uuid
 
+# orjson is a much faster drop-in for encode/decode; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to bytes, optionally pretty-printed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
 # Load Hugging Face token and repo ID from Streamlit Secrets
 hf_token = st.secrets["hf"]["token"]
 HF_REPO_ID = st.secrets["hf"]["repo_id"]
@@ -12,10 +35,18 @@ HF_REPO_ID = st.secrets["hf"]["repo_id"]
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
+# Read the users table from secrets once per process, not on every attempt
+@st.cache_resource
+def get_authorized_users():
+    return dict(st.secrets.get("authorized_users", {}))
+
 # Authentication function
 def authenticate_user(email, password):
-    authorized_users = st.secrets.get("authorized_users", {})
-    return email in authorized_users and authorized_users[email] == password
+    stored = get_authorized_users().get(email)
+    if stored is None:
+        return False
+    # Constant-time compare so timing can't leak how much of a password matched
+    return hmac.compare_digest(str(stored), password)
 
 # Login form
 if not st.session_state.authenticated:
@@ -44,15 +75,17 @@ def load_questions():
         repo_type="dataset",
         token=hf_token
     )
-    with open(questions_file_path, "r") as f:
-        questions = json.load(f)
+    with open(questions_file_path, "rb") as f:
+        questions = json_loads(f.read())
     return questions
 
 questions = load_questions()
 
-# Session state to track edits
+# Session state to track edits. Keyed by question id: deletes are O(1)
+# instead of shifting the whole list, and widget keys stay stable across
+# renders so Streamlit can diff them
 if "questions" not in st.session_state:
-    st.session_state.questions = questions
+    st.session_state.questions = {q["id"]: q for q in questions}
 
 st.title("Boteval Questions Editor")
 
@@ -68,13 +101,13 @@ with st.form("add_question_form"):
     submitted = st.form_submit_button("Add Question")
 
     if submitted:
-        if not any(q["id"] == new_id for q in st.session_state.questions):
-            st.session_state.questions.append({
+        if new_id not in st.session_state.questions:
+            st.session_state.questions[new_id] = {
                 "id": new_id,
                 "question": new_question,
                 "answer": new_answer,
                 "topic": [t.strip() for t in new_topics.split(",") if t.strip()]
-            })
+            }
             st.success("Question added.")
         else:
             st.error("ID already exists.")
@@ -84,26 +117,34 @@ st.divider()
 # --- Display existing questions ---
 st.subheader("Edit Existing Questions")
 
-for idx, q in enumerate(st.session_state.questions):
-    with st.expander(f"{q['id']}: {q['question'][:60]}"):
-        edited_question = st.text_area("Edit Question", value=q["question"], key=f"question_{idx}")
-        edited_answer = st.text_area("Edit Answer", value=q.get("answer", ""), key=f"answer_{idx}")
+# Page the list: rendering a text_area per question for every question on
+# every keystroke is what made the editor crawl at a few hundred questions
+QUESTION_PAGE_SIZE = 20
+
+question_items = list(st.session_state.questions.items())
+num_pages = max(1, (len(question_items) + QUESTION_PAGE_SIZE - 1) // QUESTION_PAGE_SIZE)
+page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1)
+
+for qid, q in question_items[(page - 1) * QUESTION_PAGE_SIZE:page * QUESTION_PAGE_SIZE]:
+    with st.expander(f"{qid}: {q['question'][:60]}"):
+        edited_question = st.text_area("Edit Question", value=q["question"], key=f"question_{qid}")
+        edited_answer = st.text_area("Edit Answer", value=q.get("answer", ""), key=f"answer_{qid}")
         edited_topics = st.text_input(
             "Edit Topics (comma separated)",
             value=", ".join(q.get("topic", [])),
-            key=f"topics_{idx}"
+            key=f"topics_{qid}"
         )
 
-        if st.button("Update", key=f"update_{idx}"):
-            st.session_state.questions[idx]["question"] = edited_question
-            st.session_state.questions[idx]["answer"] = edited_answer
-            st.session_state.questions[idx]["topic"] = [
+        if st.button("Update", key=f"update_{qid}"):
+            q["question"] = edited_question
+            q["answer"] = edited_answer
+            q["topic"] = [
                 t.strip() for t in edited_topics.split(",") if t.strip()
             ]
             st.success("Question updated.")
 
-        if st.button("Delete", key=f"delete_{idx}"):
-            st.session_state.questions.pop(idx)
+        if st.button("Delete", key=f"delete_{qid}"):
+            del st.session_state.questions[qid]
             st.success("Question deleted.")
             st.rerun()  # Refresh after delete
 
@@ -111,9 +152,9 @@ st.divider()
 
 # --- Save all changes ---
 if st.button("Save All Changes to Hugging Face"):
-    updated_json = json.dumps(st.session_state.questions, indent=2)
+    updated_json = json_dumps(list(st.session_state.questions.values()), indent=True)
     hf_api.upload_file(
-        path_or_fileobj=io.BytesIO(updated_json.encode()),
+        path_or_fileobj=updated_json,
         path_in_repo="questions.json",
         repo_id=HF_REPO_ID,
         repo_type="dataset"
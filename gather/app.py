@@ -1,28 +1,57 @@
 import streamlit as st
-st.set_page_config(page_title="Boteval Response Collector", layout="wide")
 
+import hashlib
+import hmac
 import json
 import datetime
 import uuid
-import io
 import os
+
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 import streamlit.components.v1 as components
-from huggingface_hub import HfApi, hf_hub_download
+from concurrent.futures import ThreadPoolExecutor
+from huggingface_hub import CommitOperationAdd, HfApi, hf_hub_download
+
+# orjson is a much faster drop-in for encode/decode; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to bytes, optionally pretty-printed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
 
 # Load Hugging Face token and repo ID from Streamlit Secrets
 hf_token = st.secrets["hf"]["token"]
 HF_REPO_ID = st.secrets["hf"]["repo_id"]
 
+# Metadata defaults, computed once at import instead of per rerun
+DEFAULT_MODEL = "GPT-4"
+_DEFAULT_OPERATOR = os.getenv("USER") or os.getenv("USERNAME") or "unknown"
+
+def _default_metadata():
+    return {
+        "model_name": DEFAULT_MODEL,
+        "run_id": f"experiment_{datetime.date.today().isoformat()}",
+        "operator": _DEFAULT_OPERATOR
+    }
+
 # Initialize session states
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
-if "metadata" not in st.session_state:
-    st.session_state.metadata = {
-        "model_name": "GPT-4",
-        "run_id": f"experiment_{datetime.date.today().isoformat()}",
-        "operator": os.getenv("USER") or os.getenv("USERNAME") or "unknown"
-    }
+st.session_state.setdefault("metadata", _default_metadata())
 
 if "responses" not in st.session_state:
     st.session_state.responses = {}
@@ -30,10 +59,18 @@ if "responses" not in st.session_state:
 if "session_id" not in st.session_state:
     st.session_state.session_id = None
 
+# Read the users table from secrets once per process, not on every attempt
+@st.cache_resource
+def get_authorized_users():
+    return dict(st.secrets.get("authorized_users", {}))
+
 # Authentication function
 def authenticate_user(email, password):
-    authorized_users = st.secrets.get("authorized_users", {})
-    return email in authorized_users and authorized_users[email] == password
+    stored = get_authorized_users().get(email)
+    if stored is None:
+        return False
+    # Constant-time compare so timing can't leak how much of a password matched
+    return hmac.compare_digest(str(stored), password)
 
 # Login form
 if not st.session_state.authenticated:
@@ -50,6 +87,18 @@ if not st.session_state.authenticated:
             st.error("Invalid email or password")
     st.stop()
 
+# Keyed per session id so retyping the id doesn't re-download the file
+@st.cache_data(ttl=300, show_spinner=False)
+def load_session(session_id):
+    session_file = hf_hub_download(
+        repo_id=HF_REPO_ID,
+        filename=f"gather/session-{session_id}.json",
+        repo_type="dataset",
+        token=hf_token
+    )
+    with open(session_file, "rb") as f:
+        return json_loads(f.read())
+
 # Ask for session ID after login
 if st.session_state.session_id is None:
     st.title("Session Management")
@@ -63,14 +112,7 @@ if st.session_state.session_id is None:
         if st.button("Load Session"):
             try:
                 # Try to load the session file from HF
-                session_file = hf_hub_download(
-                    repo_id=HF_REPO_ID,
-                    filename=f"gather/session-{session_id}.json",
-                    repo_type="dataset",
-                    token=hf_token
-                )
-                with open(session_file, "r") as f:
-                    session_data = json.load(f)
+                session_data = load_session(session_id)
                 st.session_state.session_id = session_id
                 st.session_state.responses = session_data.get("responses", {})
                 st.session_state.metadata = session_data.get("metadata", st.session_state.metadata)
@@ -80,37 +122,162 @@ if st.session_state.session_id is None:
                 st.error(f"Could not load session: {str(e)}")
     else:
         if st.button("Create New Session"):
-            st.session_state.session_id = str(uuid.uuid4())
+            st.session_state.session_id = uuid.uuid4().hex
             st.session_state.responses = {}
             st.success(f"New session created! Your session ID is: {st.session_state.session_id}")
             st.info("Please save this session ID to continue your work later.")
             st.rerun()
 
-# Initialize Hugging Face API client
-hf_api = HfApi(token=hf_token)
+# Reuse one HfApi client (and its HTTP connection pool) across reruns
+@st.cache_resource
+def get_hf_api():
+    return HfApi(token=hf_token)
+
+hf_api = get_hf_api()
+
+# Commits run off the script thread so the rerun returns immediately
+# instead of blocking on the Hub round-trip
+@st.cache_resource
+def get_upload_executor():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Download questions.json from Hugging Face Hub; cached so a rerun per
+# keystroke doesn't mean a network round-trip per keystroke
+@st.cache_data(ttl=300, show_spinner=False)
+def load_questions():
+    questions_file_path = hf_hub_download(
+        repo_id=HF_REPO_ID,
+        filename="questions.json",
+        repo_type="dataset",
+        token=hf_token
+    )
+    with open(questions_file_path, "rb") as f:
+        return json_loads(f.read())
+
+questions = load_questions()
 
-# Download questions.json dynamically from Hugging Face Hub
-questions_file_path = hf_hub_download(
-    repo_id=HF_REPO_ID,
-    filename="questions.json",
-    repo_type="dataset",
-    token=hf_token
-)
+# Widget keys formatted once per distinct question set rather than per
+# question per rerun
+@st.cache_data(show_spinner=False)
+def question_keys(question_ids):
+    return {qid: f"response_{qid}" for qid in question_ids}
 
-with open(questions_file_path, "r") as f:
-    questions = json.load(f)
+response_keys = question_keys(tuple(q['id'] for q in questions))
+
+
+def session_index_operation(timestamp):
+    """Build the commit operation that refreshes gather/index.json, a
+    manifest of session files, so readers fetch one small file instead of
+    listing and downloading every session. Read-modify-write; last writer
+    wins, which is fine for this manifest since each entry is keyed by
+    session_id."""
+    entry = {
+        "session_id": st.session_state.session_id,
+        "metadata": st.session_state.metadata,
+        "last_updated": timestamp,
+        "filename": f"gather/session-{st.session_state.session_id}.json"
+    }
+    try:
+        index_path = hf_hub_download(
+            repo_id=HF_REPO_ID,
+            filename="gather/index.json",
+            repo_type="dataset",
+            token=hf_token
+        )
+        with open(index_path, "rb") as f:
+            index = json_loads(f.read())
+    except Exception:
+        index = []
+    index = [e for e in index if e.get("session_id") != entry["session_id"]]
+    index.append(entry)
+    return CommitOperationAdd(
+        path_in_repo="gather/index.json",
+        path_or_fileobj=json_dumps(index)
+    )
 
 st.title("LLM Response Collector")
 
 # Display session ID
 st.info(f"Current Session ID: {st.session_state.session_id}")
 
+# Surface failures from background uploads started on earlier reruns
+if "pending_uploads" not in st.session_state:
+    st.session_state.pending_uploads = []
+
+still_pending = []
+for future in st.session_state.pending_uploads:
+    if future.done():
+        error = future.exception()
+        if error is not None:
+            st.error(f"Background upload failed: {error}")
+    else:
+        still_pending.append(future)
+st.session_state.pending_uploads = still_pending
+
+def session_state_digest():
+    """Hash of the savable session state, excluding the timestamp, so
+    identical content always produces the same digest."""
+    return hashlib.blake2b(json_dumps({
+        "session_id": st.session_state.session_id,
+        "metadata": st.session_state.metadata,
+        "responses": st.session_state.responses
+    }), digest_size=16).digest()
+
+# Autosave: a fragment reruns just this block every 30s instead of the
+# whole script, and the hash guard skips the upload when nothing changed
+@st.fragment(run_every=30)
+def autosave_session():
+    # Nothing to save until a session exists; without this guard the tick
+    # fires on the session-management screen and uploads session-None.json
+    if st.session_state.session_id is None:
+        return
+    digest = session_state_digest()
+    if digest == st.session_state.get("last_saved_hash"):
+        return
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    session_data = {
+        "session_id": st.session_state.session_id,
+        "metadata": st.session_state.metadata,
+        "last_updated": timestamp,
+        "responses": st.session_state.responses
+    }
+    # Same commit shape as the explicit save: snapshot plus index refresh,
+    # so sessions persisted only by autosave still enter the manifest
+    st.session_state.pending_uploads.append(get_upload_executor().submit(
+        hf_api.create_commit,
+        repo_id=HF_REPO_ID,
+        repo_type="dataset",
+        operations=[
+            CommitOperationAdd(
+                path_in_repo=f"gather/session-{st.session_state.session_id}.json",
+                path_or_fileobj=json_dumps(session_data)
+            ),
+            session_index_operation(timestamp),
+        ],
+        commit_message=f"Autosave session {st.session_state.session_id}"
+    ))
+    st.session_state.last_saved_hash = digest
+    st.caption(f"Session autosaved at {timestamp}")
+
+autosave_session()
+
 # Metadata input fields
 st.subheader("Metadata")
 
-st.session_state.metadata["model_name"] = st.text_input("Model Name", value=st.session_state.metadata["model_name"])
-st.session_state.metadata["run_id"] = st.text_input("Run ID", value=st.session_state.metadata["run_id"])
-st.session_state.metadata["operator"] = st.text_input("Operator", value=st.session_state.metadata["operator"])
+# Form-wrapped so typing doesn't trigger a full script rerun (and its Hub
+# round-trips) per keystroke; state commits once on submit
+with st.form("metadata_form"):
+    # Local alias: session_state subscripts go through the proxy's method
+    # dispatch, so bind the dict once per rerun
+    md = st.session_state.metadata
+    model_name = st.text_input("Model Name", value=md["model_name"])
+    run_id = st.text_input("Run ID", value=md["run_id"])
+    operator = st.text_input("Operator", value=md["operator"])
+    if st.form_submit_button("Update Metadata"):
+        md["model_name"] = model_name
+        md["run_id"] = run_id
+        md["operator"] = operator
+        st.success("Metadata updated!")
 
 st.markdown("---")
 
@@ -121,11 +288,7 @@ if not st.session_state.responses:
 # Clear Form button
 if st.button("Clear Form"):
     st.session_state.responses = {q['id']: "" for q in questions}
-    st.session_state.metadata = {
-        "model_name": "GPT-4",
-        "run_id": f"experiment_{datetime.date.today().isoformat()}",
-        "operator": os.getenv("USER", "unknown")
-    }
+    st.session_state.metadata = _default_metadata()
     st.success("Form and metadata cleared!")
 
 # Main form
@@ -156,84 +319,116 @@ def copy_to_clipboard(text):
     """
     components.html(html_code, height=30)
 
-for q in questions:
-    qid = q['id']
-    st.subheader(f"Question ID: {qid}")
-    
-    # Create columns for question and copy button
-    col1, col2 = st.columns([0.95, 0.05])
-    with col1:
-        st.markdown(q['question'])
-    with col2:
-        copy_to_clipboard(q['question'])
-    
-    response = st.text_area(
-        "Your Response",
-        value=st.session_state.responses.get(qid, ""),
-        height=200,
-        key=f"response_{qid}"
-    )
-    
-    st.session_state.responses[qid] = response
-    
-    # Submit button for individual question
-    if st.button(f"Submit Response for {qid}", key=f"submit_{qid}"):
-        timestamp = datetime.datetime.now().isoformat().replace(":", "-")
-        file_id = str(uuid.uuid4())
-        filename = f"gather/submission-{timestamp}-{file_id}.json"
+# One form around the whole question list: typing a response no longer
+# reruns the script per keystroke, and one submit replaces N per-question
+# buttons (each of which cost a Hub commit)
+with st.form("all_responses"):
+    responses = st.session_state.responses
+    for q in questions:
+        qid = q['id']
+        st.subheader(f"Question ID: {qid}")
 
-        submission = {
-            "session_id": st.session_state.session_id,
-            "timestamp": timestamp,
-            "model_name": st.session_state.metadata["model_name"],
-            "run_id": st.session_state.metadata["run_id"],
-            "operator": st.session_state.metadata["operator"],
-            "question_id": qid,
-            "responses": {qid: response}
-        }
+        # Create columns for question and copy button
+        col1, col2 = st.columns([0.95, 0.05])
+        with col1:
+            st.markdown(q['question'])
+        with col2:
+            copy_to_clipboard(q['question'])
 
-        submission_json = json.dumps(submission, indent=2)
-        hf_api.upload_file(
-            path_or_fileobj=io.BytesIO(submission_json.encode()),
-            path_in_repo=filename,
-            repo_id=HF_REPO_ID,
-            repo_type="dataset"
+        st.text_area(
+            "Your Response",
+            value=responses.get(qid, ""),
+            height=200,
+            key=response_keys[qid]
         )
 
-        # Save session state
-        session_data = {
-            "session_id": st.session_state.session_id,
-            "metadata": st.session_state.metadata,
-            "last_updated": timestamp,
-            "responses": st.session_state.responses
-        }
-        session_json = json.dumps(session_data, indent=2)
-        hf_api.upload_file(
-            path_or_fileobj=io.BytesIO(session_json.encode()),
-            path_in_repo=f"gather/session-{st.session_state.session_id}.json",
-            repo_id=HF_REPO_ID,
-            repo_type="dataset"
-        )
+        st.divider()
 
-        st.success(f"Response for {qid} submitted successfully!")
+    submitted = st.form_submit_button("Submit All Responses")
 
-    st.divider()
+if submitted:
+    responses = st.session_state.responses
+    for q in questions:
+        responses[q['id']] = st.session_state[response_keys[q['id']]]
 
-# Save session button
-if st.button("Save Current Session"):
-    timestamp = datetime.datetime.now().isoformat()
+    # Filename-safe from the start -- no second pass to strip colons
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    file_id = uuid.uuid4().hex
+    filename = f"gather/submission-{timestamp}-{file_id}.json"
+
+    md = st.session_state.metadata
+    submission = {
+        "session_id": st.session_state.session_id,
+        "timestamp": timestamp,
+        "model_name": md["model_name"],
+        "run_id": md["run_id"],
+        "operator": md["operator"],
+        "responses": dict(responses)
+    }
+
+    # Save session state
     session_data = {
         "session_id": st.session_state.session_id,
         "metadata": st.session_state.metadata,
         "last_updated": timestamp,
         "responses": st.session_state.responses
     }
-    session_json = json.dumps(session_data, indent=2)
-    hf_api.upload_file(
-        path_or_fileobj=io.BytesIO(session_json.encode()),
-        path_in_repo=f"gather/session-{st.session_state.session_id}.json",
+
+    # Submission, session snapshot and index land in one commit -- one
+    # round-trip instead of three sequential uploads -- and the commit
+    # itself runs in the background so the button doesn't freeze on it
+    st.session_state.pending_uploads.append(get_upload_executor().submit(
+        hf_api.create_commit,
         repo_id=HF_REPO_ID,
-        repo_type="dataset"
-    )
-    st.success("Session saved successfully!")
+        repo_type="dataset",
+        operations=[
+            # Compact form: these files are only read by machines, and
+            # pretty-printing roughly doubles the upload bytes
+            CommitOperationAdd(
+                path_in_repo=filename,
+                path_or_fileobj=json_dumps(submission)
+            ),
+            CommitOperationAdd(
+                path_in_repo=f"gather/session-{st.session_state.session_id}.json",
+                path_or_fileobj=json_dumps(session_data)
+            ),
+            session_index_operation(timestamp),
+        ],
+        commit_message="Submit responses"
+    ))
+
+    # The commit carries a session snapshot; record its hash so the next
+    # autosave tick and save click don't re-upload identical content
+    st.session_state.last_saved_hash = session_state_digest()
+
+    st.success("Responses submitted! Uploading in the background.")
+
+# Save session button
+if st.button("Save Current Session"):
+    digest = session_state_digest()
+    if digest == st.session_state.get("last_saved_hash"):
+        st.info("No changes since the last save.")
+    else:
+        timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        session_data = {
+            "session_id": st.session_state.session_id,
+            "metadata": st.session_state.metadata,
+            "last_updated": timestamp,
+            "responses": st.session_state.responses
+        }
+        st.session_state.pending_uploads.append(get_upload_executor().submit(
+            hf_api.create_commit,
+            repo_id=HF_REPO_ID,
+            repo_type="dataset",
+            operations=[
+                CommitOperationAdd(
+                    path_in_repo=f"gather/session-{st.session_state.session_id}.json",
+                    path_or_fileobj=json_dumps(session_data)
+                ),
+                session_index_operation(timestamp),
+            ],
+            commit_message=f"Save session {st.session_state.session_id}"
+        ))
+        st.session_state.last_saved_hash = digest
+        st.success("Session saved! Uploading in the background.")
 
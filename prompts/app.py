@@ -1,18 +1,44 @@
 import streamlit as st
-st.set_page_config(page_title="Boteval Prompt Manager", layout="wide")
 
 import json
 import datetime
 import uuid
-import io
-from huggingface_hub import HfApi, hf_hub_download
+import os
+import pandas as pd
+
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from huggingface_hub import CommitOperationAdd, HfApi, hf_hub_download
+
+# orjson is a much faster drop-in for encode/decode; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to bytes, optionally pretty-printed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
 
 # Load secrets
 hf_token = st.secrets["hf"]["token"]
 HF_REPO_ID = st.secrets["hf"]["repo_id"]
 
-# Initialize Hugging Face API client
-hf_api = HfApi(token=hf_token)
+# Reuse one HfApi client (and its HTTP connection pool) across reruns
+@st.cache_resource
+def get_hf_api():
+    return HfApi(token=hf_token)
+
+hf_api = get_hf_api()
 
 # Function to load prompts
 @st.cache_data(ttl=60)
@@ -24,13 +50,14 @@ def load_prompts():
             repo_type="dataset",
             token=hf_token
         )
-        with open(prompts_file_path, "r") as f:
-            return json.load(f)
+        with open(prompts_file_path, "rb") as f:
+            return json_loads(f.read())
     except Exception as e:
         st.warning("No prompts file found. Creating new one.")
         return {"prompts": {}}
 
-# Function to load evaluation schema
+# Function to load evaluation schema. Returns the parsed schema and its
+# pretty-printed form, serialized once here instead of on every rerun
 @st.cache_data(ttl=60)
 def load_evaluation_schema():
     try:
@@ -40,25 +67,46 @@ def load_evaluation_schema():
             repo_type="dataset",
             token=hf_token
         )
-        with open(schema_file_path, "r") as f:
-            return json.load(f)
+        with open(schema_file_path, "rb") as f:
+            schema = json_loads(f.read())
+        return schema, json_dumps(schema, indent=True).decode()
     except Exception as e:
         st.warning("Could not load evaluation schema.")
-        return None
+        return None, ""
 
 # Function to save prompts
 def save_prompts(prompts_data):
-    prompts_json = json.dumps(prompts_data, indent=2)
-    hf_api.upload_file(
-        path_or_fileobj=io.BytesIO(prompts_json.encode()),
-        path_in_repo="system_prompts.json",
+    # Indented: system_prompts.json is browsed by humans on the Hub.
+    # create_commit handles large bodies with chunked parallel PUTs when
+    # hf_transfer is enabled, which matters after a bulk import
+    hf_api.create_commit(
         repo_id=HF_REPO_ID,
-        repo_type="dataset"
+        repo_type="dataset",
+        operations=[CommitOperationAdd(
+            path_in_repo="system_prompts.json",
+            path_or_fileobj=json_dumps(prompts_data, indent=True)
+        )],
+        commit_message="Update system prompts"
     )
 
+# Overview table, built column-wise and cached per distinct library state
+# so unchanged reruns pay nothing beyond the hash check
+@st.cache_data
+def _prompts_df(prompts_data):
+    # Defaults throughout: the import path merges arbitrary uploaded
+    # prompt dicts, so none of these fields is guaranteed to exist
+    prompts = list(prompts_data["prompts"].values())
+    return pd.DataFrame({
+        "Name": [p.get("name", "") for p in prompts],
+        "Description": [p.get("description", "") for p in prompts],
+        "Tags": [", ".join(p.get("tags", [])) for p in prompts],
+        "Model": [p.get("metadata", {}).get("model", "") for p in prompts],
+        "Last Updated": [p.get("updated_at", "") for p in prompts]
+    })
+
 # Load existing prompts and evaluation schema
 prompts_data = load_prompts()
-evaluation_schema = load_evaluation_schema()
+evaluation_schema, evaluation_schema_str = load_evaluation_schema()
 
 st.title("System Prompt Manager")
 
@@ -74,15 +122,21 @@ with prompt_tab:
         uploaded_file = st.file_uploader("Upload a JSON file with prompts", type=['json'])
         if uploaded_file is not None:
             try:
-                imported_data = json.load(uploaded_file)
+                imported_data = json_loads(uploaded_file.read())
                 if st.button("Import from File"):
-                    # Merge imported prompts with existing ones
-                    for prompt_id, prompt in imported_data.get("prompts", {}).items():
-                        if prompt_id not in prompts_data["prompts"]:
-                            prompt["id"] = prompt_id
-                            prompt["created_at"] = datetime.datetime.now().isoformat()
-                            prompt["updated_at"] = datetime.datetime.now().isoformat()
-                            prompts_data["prompts"][prompt_id] = prompt
+                    # Merge only prompts we don't already have: key
+                    # difference plus one dict.update, all C-level
+                    new_ids = imported_data.get("prompts", {}).keys() - prompts_data["prompts"].keys()
+                    now_iso = datetime.datetime.now().isoformat()
+                    prompts_data["prompts"].update({
+                        prompt_id: {
+                            **imported_data["prompts"][prompt_id],
+                            "id": prompt_id,
+                            "created_at": now_iso,
+                            "updated_at": now_iso
+                        }
+                        for prompt_id in new_ids
+                    })
                     save_prompts(prompts_data)
                     st.success("Prompts imported successfully!")
                     st.rerun()
@@ -93,15 +147,21 @@ with prompt_tab:
         json_text = st.text_area("Paste your JSON here", height=200)
         if json_text:
             try:
-                imported_data = json.loads(json_text)
+                imported_data = json_loads(json_text)
                 if st.button("Import from Text"):
-                    # Merge imported prompts with existing ones
-                    for prompt_id, prompt in imported_data.get("prompts", {}).items():
-                        if prompt_id not in prompts_data["prompts"]:
-                            prompt["id"] = prompt_id
-                            prompt["created_at"] = datetime.datetime.now().isoformat()
-                            prompt["updated_at"] = datetime.datetime.now().isoformat()
-                            prompts_data["prompts"][prompt_id] = prompt
+                    # Merge only prompts we don't already have: key
+                    # difference plus one dict.update, all C-level
+                    new_ids = imported_data.get("prompts", {}).keys() - prompts_data["prompts"].keys()
+                    now_iso = datetime.datetime.now().isoformat()
+                    prompts_data["prompts"].update({
+                        prompt_id: {
+                            **imported_data["prompts"][prompt_id],
+                            "id": prompt_id,
+                            "created_at": now_iso,
+                            "updated_at": now_iso
+                        }
+                        for prompt_id in new_ids
+                    })
                     save_prompts(prompts_data)
                     st.success("Prompts imported successfully!")
                     st.rerun()
@@ -110,6 +170,12 @@ with prompt_tab:
 
     st.divider()
 
+    # Library overview
+    if prompts_data["prompts"]:
+        st.subheader("Prompt Library")
+        st.dataframe(_prompts_df(prompts_data), use_container_width=True)
+        st.divider()
+
     # Sidebar for prompt selection and creation
     with st.sidebar:
         st.header("Prompt Management")
@@ -117,7 +183,7 @@ with prompt_tab:
         # Add new prompt
         if st.button("Create New Prompt"):
             st.session_state.editing_prompt = {
-                "id": str(uuid.uuid4()),
+                "id": uuid.uuid4().hex,
                 "name": "",
                 "description": "",
                 "content": "",
@@ -134,11 +200,23 @@ with prompt_tab:
                 }
             }
         
-        # List existing prompts
+        # List existing prompts. One selectbox instead of a button per
+        # prompt: the widget tree stays O(1) as the library grows
         st.subheader("Existing Prompts")
-        for prompt_id, prompt in prompts_data["prompts"].items():
-            if st.button(f"📝 {prompt['name']}", key=f"select_{prompt_id}"):
-                st.session_state.editing_prompt = prompt
+        prompt_ids = list(prompts_data["prompts"].keys())
+        if prompt_ids:
+            selected_id = st.selectbox(
+                "Select a prompt to edit",
+                prompt_ids,
+                index=None,
+                format_func=lambda pid: prompts_data["prompts"][pid]["name"]
+            )
+            # Load only when the selection changes: the selectbox retains
+            # its value across reruns, so an unconditional assignment would
+            # clobber e.g. a freshly created blank prompt on the same rerun
+            if selected_id is not None and selected_id != st.session_state.get("last_selected_prompt"):
+                st.session_state.editing_prompt = prompts_data["prompts"][selected_id]
+            st.session_state.last_selected_prompt = selected_id
 
     # Main content area for prompt editing
     if "editing_prompt" in st.session_state:
@@ -190,7 +268,8 @@ with generate_tab:
     # Display evaluation schema if available
     if evaluation_schema:
         st.subheader("Evaluation Schema")
-        st.json(evaluation_schema)
+        # Pre-rendered string: st.json would re-serialize every rerun
+        st.code(evaluation_schema_str, language="json")
     else:
         st.warning("No evaluation schema found. Please ensure evaluation.json exists in the repository.")
     
@@ -225,12 +304,12 @@ Custom Instructions:
 {custom_prompt}
 
 Evaluation Schema:
-{json.dumps(evaluation_schema, indent=2)}
+{evaluation_schema_str}
 
 Please evaluate the responses according to both the custom instructions and the evaluation schema provided above."""
 
             # Create prompt object
-            prompt_id = str(uuid.uuid4())
+            prompt_id = uuid.uuid4().hex
             new_prompt = {
                 "id": prompt_id,
                 "name": prompt_name,
@@ -263,8 +342,4 @@ Please evaluate the responses according to both the custom instructions and the
             # Add copy button
             if st.button("Copy to Clipboard"):
                 st.code(system_prompt)
-                st.success("System prompt copied to clipboard!")
-
-if "selected_session_ids" not in st.session_state:
-    st.session_state.selected_session_ids = []
-st.session_state.selected_session_ids = [session["session_id"] for session in selected_sessions] 
\ No newline at end of file
+                st.success("System prompt copied to clipboard!")
\ No newline at end of file
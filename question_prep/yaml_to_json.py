@@ -3,23 +3,31 @@ import json
 import sys
 from pathlib import Path
 
+# libyaml's C parser is roughly an order of magnitude faster than the
+# pure-Python default; fall back when PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 def convert_yaml_to_json(yaml_file):
     # Read YAML file
     with open(yaml_file, 'r') as f:
-        data = yaml.safe_load(f)
-    
+        data = yaml.load(f, Loader=_SafeLoader)
+
     # Extract only id, question and answer
-    simplified_data = []
-    for qa_pair in data['qa_pairs']:
-        simplified_data.append({
+    simplified_data = [
+        {
             'id': qa_pair['id'],
             'question': qa_pair['question'],
             'answer': qa_pair['answer']
-        })
-    
-    # Write to JSON file
+        }
+        for qa_pair in data['qa_pairs']
+    ]
+
+    # Write to JSON file through a large buffer in one pass
     output_file = Path(yaml_file).stem + '.json'
-    with open(output_file, 'w') as f:
+    with open(output_file, 'w', buffering=1 << 20) as f:
         json.dump(simplified_data, f, indent=2)
     
     print(f"Converted {yaml_file} to {output_file}")
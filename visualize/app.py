@@ -1,13 +1,39 @@
 import streamlit as st
 import json
 import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import plotly.graph_objects as go
-from huggingface_hub import HfApi, hf_hub_download
+
+# Use the Rust-based downloader; must be set before huggingface_hub is imported
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from concurrent.futures import ThreadPoolExecutor
+from huggingface_hub import HfApi, snapshot_download
 import hashlib
+import hmac
+
+# orjson is a much faster drop-in for decoding; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-st.set_page_config(layout="wide", page_title="Model Evaluation Comparison")
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Reuse one HfApi client (and its HTTP connection pool) across reruns
+@st.cache_resource
+def _hf_api(token):
+    return HfApi(token=token)
+
+# One cached listing instead of a repo-wide API call per rerun
+@st.cache_data(ttl=300)
+def _list_files(repo_id, token):
+    return _hf_api(token).list_repo_files(repo_id, repo_type="dataset")
 
 def get_hf_token():
     """Get HF token from Streamlit secrets"""
@@ -34,29 +60,36 @@ def check_auth():
         st.session_state.authenticated = False
     
     if not st.session_state.authenticated:
-        try:
-            users = st.secrets["authorized_users"]
-        except:
-            # If secrets aren't configured, skip authentication
-            st.warning("Authentication not configured - proceeding without login")
-            return True
-            
+        # Hash the users table once per session: later reruns skip the
+        # secrets (TOML) read and never hold plaintext passwords around
+        if '_users_hashed' not in st.session_state:
+            try:
+                users = st.secrets["authorized_users"]
+            except:
+                # If secrets aren't configured, skip authentication
+                st.warning("Authentication not configured - proceeding without login")
+                return True
+            st.session_state._users_hashed = {
+                username: hashlib.sha256(password.encode()).digest()
+                for username, password in users.items()
+            }
+        users_hashed = st.session_state._users_hashed
+
         st.title("Login")
         username = st.text_input("Username")
         password = st.text_input("Password", type="password")
-        
+
         if st.button("Login"):
-            if username in users:
-                stored_password = users[username]
-                if password == stored_password:
-                    st.session_state.authenticated = True
-                    st.rerun()
-                else:
-                    st.error("Invalid password")
+            # Constant-time digest compare; one error message so failed
+            # logins don't reveal which usernames exist
+            password_hash = hashlib.sha256(password.encode()).digest()
+            if hmac.compare_digest(users_hashed.get(username, b''), password_hash):
+                st.session_state.authenticated = True
+                st.rerun()
             else:
-                st.error("Invalid username")
+                st.error("Invalid username or password")
         return False
-    
+
     return True
 
 @st.cache_data(ttl=3600)  # Cache for 1 hour
@@ -100,107 +133,256 @@ def load_evaluation_data(repo_id, directory="compare", selected_files=None):
         st.error("Hugging Face token not found in Streamlit secrets! Please add token under [hf] section.")
         return {}, {}
     
-    # Initialize HF API
-    api = HfApi(token=token)
-    
     try:
-        # List files in the directory
-        files = api.list_repo_files(repo_id, repo_type="dataset")
-        json_files = [f for f in files if f.startswith(f"{directory}/") and f.endswith(".json")]
-        
-        # Filter files if specific ones are selected
+        # One snapshot call fetches every matching file through a worker
+        # pool, instead of a serial round-trip per file
         if selected_files:
-            json_files = [f for f in json_files if Path(f).stem in selected_files]
-        
-        for file_path in json_files:
+            allow_patterns = [f"{directory}/{name}.json" for name in selected_files]
+        else:
+            allow_patterns = [f"{directory}/*.json"]
+        snap_dir = snapshot_download(
+            repo_id=repo_id,
+            repo_type="dataset",
+            allow_patterns=allow_patterns,
+            token=token,
+            max_workers=8
+        )
+
+        # The snapshot dir can hold files from earlier, broader calls, so
+        # re-apply the selection when globbing
+        json_files = sorted(Path(snap_dir, directory).glob("*.json"))
+        if selected_files:
+            selected = set(selected_files)
+            json_files = [p for p in json_files if p.stem in selected]
+
+        # Parse in a small pool: file reads release the GIL, so decode
+        # overlaps disk I/O across files
+        errors = []
+
+        def _load_one(path):
             try:
-                # Download file
-                local_path = hf_hub_download(
-                    repo_id=repo_id,
-                    repo_type="dataset",
-                    filename=file_path,
-                    token=token
-                )
-                
-                # Load data
-                with open(local_path, 'r') as f:
-                    data = json.load(f)
-                    model_name = Path(file_path).stem
-                    evaluations[model_name] = data
-                    schemas[model_name] = extract_schema(data)
+                return path.stem, json_loads(path.read_bytes())
             except Exception as e:
-                st.warning(f"Error loading {file_path}: {str(e)}")
-    
+                errors.append((path.name, str(e)))
+                return None
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = [r for r in executor.map(_load_one, json_files) if r is not None]
+
+        for model_name, data in results:
+            evaluations[model_name] = data
+            schemas[model_name] = extract_schema(data)
+
+        for name, error in errors:
+            st.warning(f"Error loading {name}: {error}")
+
     except Exception as e:
         st.error(f"Error accessing Hugging Face repository: {str(e)}")
         return {}, {}
-    
+
     return evaluations, schemas
 
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def create_comparison_table(evaluations, score_types):
-    """Create a DataFrame comparing scores across models."""
-    comparison_data = []
-    
-    # Get all unique question IDs
-    all_questions = set()
-    for eval_data in evaluations.values():
-        all_questions.update(q['question_id'] for q in eval_data.get('evaluations', []))
-    
-    # Create comparison data
-    for question_id in sorted(all_questions):
-        row_data = {'question_id': question_id}
-        
-        # Get scores for each model
-        for model_name, eval_data in evaluations.items():
-            # Get evaluator from metadata
-            evaluator = eval_data.get('evaluation_metadata', {}).get('evaluator', 'unknown')
-            row_data[f"{model_name}_evaluator"] = evaluator
-            
-            # Find the question in this model's evaluations
-            question_data = next(
-                (q for q in eval_data.get('evaluations', []) 
-                 if q['question_id'] == question_id),
-                None
-            )
-            
-            if question_data:
-                # Add scores for this model
-                for score_type in score_types:
-                    row_data[f"{model_name}_{score_type}"] = question_data['scores'].get(score_type, None)
-            else:
-                # Question not found in this model's evaluations
-                for score_type in score_types:
-                    row_data[f"{model_name}_{score_type}"] = None
-        
-        comparison_data.append(row_data)
-    
-    return pd.DataFrame(comparison_data)
+    """Create a DataFrame comparing scores across models.
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def create_score_heatmap(df, score_type):
-    """Create a heatmap of scores for a specific score type."""
+    Built as one long frame pivoted to wide form, so pandas allocates
+    typed columns directly instead of ingesting a Python dict per row.
+    Output columns match the old row-append version: question_id plus
+    {model}_{score} and {model}_evaluator.
+    """
+    score_types = list(score_types)
+    rows = [
+        {
+            'question_id': q['question_id'],
+            'model': model_name,
+            **{s: q['scores'].get(s) for s in score_types}
+        }
+        for model_name, eval_data in evaluations.items()
+        for q in eval_data.get('evaluations', [])
+    ]
+    if not rows:
+        return pd.DataFrame(columns=['question_id'])
+
+    long = pd.DataFrame(rows)
+    # Last entry wins on duplicate (question, model) pairs, matching the
+    # dict-index behavior this replaces
+    long = long.drop_duplicates(['question_id', 'model'], keep='last')
+    wide = long.pivot(index='question_id', columns='model', values=score_types)
+    wide.columns = [f"{model}_{score}" for score, model in wide.columns]
+    # A model whose evaluations list is empty contributes no rows, so the
+    # pivot lacks its columns; reindex against the full model x score-type
+    # product so such models get all-NaN columns instead of a KeyError in
+    # the dtype pass below
+    wide = wide.reindex(columns=[
+        f"{model_name}_{score_type}"
+        for score_type in score_types
+        for model_name in evaluations
+    ])
+
+    # Shrink the table: scores fit float32 easily (ints 1-10 plus NaN),
+    # and evaluators/ids repeat heavily, so category interns them. This
+    # shrinks what st.dataframe and plotly serialize, not just RAM.
+    for score_type in score_types:
+        for model_name in evaluations:
+            col = f"{model_name}_{score_type}"
+            wide[col] = wide[col].astype('float32')
+
+    # Evaluator is constant per model, so broadcast it as a column
+    for model_name, eval_data in evaluations.items():
+        evaluator = eval_data.get('evaluation_metadata', {}).get('evaluator', 'unknown')
+        wide[f"{model_name}_evaluator"] = pd.Categorical([evaluator] * len(wide))
+
+    out = wide.sort_index().reset_index()
+    out['question_id'] = out['question_id'].astype('category')
+    return out
+
+# Comparison table with an on-disk parquet cache keyed by repo revision
+# and selection. Streamlit's cache dies with the process; the parquet
+# copy turns a warm rerun after a restart into one memory-mapped read
+# instead of a JSON walk plus pivot. Any new repo commit changes the sha
+# and invalidates the entry.
+@st.cache_data(ttl=300)
+def cached_comparison_table(repo_id, selected_files, score_types, _evaluations, token):
+    path = None
+    try:
+        rev = _hf_api(token).dataset_info(repo_id).sha
+        key = hashlib.blake2b(
+            repr((rev, sorted(selected_files), sorted(score_types))).encode(),
+            digest_size=16
+        ).hexdigest()
+        path = Path(f"/tmp/boteval_comparison_{key}.parquet")
+        if path.exists():
+            return pd.read_parquet(path, engine="pyarrow", memory_map=True)
+    except Exception:
+        path = None
+
+    df = create_comparison_table(_evaluations, score_types)
+    if path is not None:
+        try:
+            df.to_parquet(path, engine="pyarrow")
+        except Exception:
+            pass
+    return df
+
+@st.cache_data(ttl=3600)
+def _common_scores(schemas_key, _schemas):
+    """Score types present in every model's schema."""
+    return set.intersection(*[set(s['score_types']) for s in _schemas.values()])
+
+@st.cache_data(ttl=3600)
+def _evaluator_map(models_key, _evaluations):
+    """Evaluator name per model, read once from the raw metadata."""
+    return {
+        model_name: eval_data.get('evaluation_metadata', {}).get('evaluator', 'unknown')
+        for model_name, eval_data in _evaluations.items()
+    }
+
+@st.cache_data(ttl=3600)
+def _schema_df(schemas_key, _schemas):
+    """One table summarizing every model's schema.
+
+    A single dataframe message replaces O(models) expander widgets in the
+    sidebar; keyed on the (model, score-type) shape so it only rebuilds
+    when the schemas actually change.
+    """
+    return pd.DataFrame({
+        model_name: {
+            'Score Types': ', '.join(sorted(schema['score_types'])),
+            'Metadata Fields': ', '.join(sorted(schema['metadata_fields'])),
+            'Evaluation Fields': ', '.join(sorted(schema['evaluation_fields'])),
+        }
+        for model_name, schema in _schemas.items()
+    }).T
+
+# Cache key for DataFrame arguments: one vectorized row-hash pass beats
+# Streamlit's default recursive walk over the whole frame on every call
+_DF_HASH = {pd.DataFrame: lambda df: int(pd.util.hash_pandas_object(df, index=False).sum())}
+
+@st.cache_data(ttl=3600, hash_funcs=_DF_HASH)
+def _filter_questions(df, excluded_questions):
+    """Drop excluded question rows, cached per (frame, exclusion) pair.
+
+    The boolean isin scan over the full table runs on every rerun
+    otherwise, including reruns that only touched an unrelated widget.
+    """
+    if not excluded_questions:
+        return df
+    return df[~df['question_id'].isin(excluded_questions)]
+
+@st.cache_data(ttl=3600, hash_funcs=_DF_HASH)
+def _df_to_csv(df):
+    """Serialize a frame for download once per distinct frame.
+
+    Rendering a download button forces its payload to exist, so without
+    caching every rerun re-serializes the full comparison table just in
+    case the user clicks.
+    """
+    return df.to_csv(index=False)
+
+@st.cache_data(ttl=3600, hash_funcs=_DF_HASH)  # Cache for 1 hour
+def create_score_heatmap(df, score_type, max_rows=1000):
+    """Create a heatmap of scores for a specific score type.
+
+    Above max_rows, consecutive questions are averaged into fixed bins:
+    payload size and browser render cost scale with the rows shipped,
+    and individual rows are unreadable at that density anyway.
+    """
     # Extract columns for the specific score type
     score_cols = [col for col in df.columns if col.endswith(f"_{score_type}")]
     model_names = [col.replace(f"_{score_type}", "") for col in score_cols]
-    
+
     # Create heatmap data
     heatmap_data = df[score_cols].values
-    
-    fig = go.Figure(data=go.Heatmap(
-        z=heatmap_data,
-        x=model_names,
-        y=df['question_id'],
-        colorscale='RdYlGn',
-        zmin=1,
-        zmax=10,
-        colorbar=dict(title=f"{score_type.replace('_', ' ').title()} Score"),
-        xgap=1,  # Add gap between x-axis elements
-        ygap=1,  # Add gap between y-axis elements
-        text=heatmap_data,  # Add text values
-        texttemplate="%{text:.1f}",  # Format text to 1 decimal place
-        textfont={"color": "black"},  # Set text color to black
-    ))
+    y_labels = df['question_id']
+
+    if len(df) > max_rows:
+        bins = np.array_split(np.arange(len(df)), max_rows)
+        heatmap_data = np.vstack([np.nanmean(heatmap_data[b], axis=0) for b in bins])
+        question_ids = df['question_id'].to_numpy()
+        y_labels = [f"{question_ids[b[0]]}..{question_ids[b[-1]]}" for b in bins]
+
+    # WebGL for large tables: SVG heatmaps degrade sharply past a few
+    # thousand cells, and the per-cell text is unreadable there anyway.
+    # Heatmapgl is absent from some plotly releases, hence the getattr.
+    heatmap_gl = getattr(go, "Heatmapgl", None)
+    if heatmap_gl is not None and len(df) > 200:
+        # Scores only feed a 256-step color lookup here, so quantize to
+        # whole numbers on a 0-255 scale -- short integers in the JSON
+        # payload instead of full floats, with visually identical output.
+        # Kept as float so NaN survives: missing scores must stay blank
+        # cells, not render as the worst score.
+        z_q = ((np.clip(heatmap_data, 1, 10) - 1) * (255 / 9)).round()
+        trace = heatmap_gl(
+            z=z_q,
+            x=model_names,
+            y=y_labels,
+            colorscale='RdYlGn',
+            zmin=0,
+            zmax=255,
+            colorbar=dict(
+                title=f"{score_type.replace('_', ' ').title()} Score",
+                tickvals=[0, 255],
+                ticktext=['1', '10']
+            ),
+        )
+    else:
+        trace = go.Heatmap(
+            z=heatmap_data,
+            x=model_names,
+            y=y_labels,
+            colorscale='RdYlGn',
+            zmin=1,
+            zmax=10,
+            colorbar=dict(title=f"{score_type.replace('_', ' ').title()} Score"),
+            xgap=1,  # Add gap between x-axis elements
+            ygap=1,  # Add gap between y-axis elements
+            text=heatmap_data,  # Add text values
+            texttemplate="%{text:.1f}",  # Format text to 1 decimal place
+            textfont={"color": "black"},  # Set text color to black
+        )
+
+    fig = go.Figure(data=trace)
     
     # Add black grid lines
     fig.update_xaxes(
@@ -233,23 +415,33 @@ def create_score_heatmap(df, score_type):
     
     return fig
 
-def create_score_histogram(_model_names, _excluded_questions, df, score_type):
-    """Create a histogram of scores for a specific score type across models."""
+@st.cache_data(ttl=3600, hash_funcs=_DF_HASH)  # Cache for 1 hour
+def create_score_histogram(model_names, excluded_questions, df, score_type):
+    """Create a histogram of scores for a specific score type across models.
+
+    Binned here with np.histogram, so the browser receives 20 bar
+    heights per model instead of every raw score to bin itself.
+    """
     # Filter the dataframe based on excluded questions
-    filtered_df = df[~df['question_id'].isin(_excluded_questions)]
-    
+    filtered_df = df[~df['question_id'].isin(excluded_questions)]
+
+    edges = np.linspace(1, 10, 21)
+    centers = (edges[:-1] + edges[1:]) / 2
+
     fig = go.Figure()
-    
-    for model_name in _model_names:
+
+    for model_name in model_names:
         col_name = f"{model_name}_{score_type}"
-        scores = filtered_df[col_name].dropna()
-        
-        fig.add_trace(go.Histogram(
-            x=scores,
+        scores = filtered_df[col_name].dropna().to_numpy()
+        if len(scores) == 0:
+            continue
+        counts, _ = np.histogram(scores, bins=edges)
+
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=counts / counts.sum(),
             name=model_name,
-            opacity=0.7,
-            nbinsx=20,
-            histnorm='probability'
+            opacity=0.7
         ))
     
     fig.update_layout(
@@ -309,9 +501,8 @@ def main():
     # Initialize HF API to get available files
     token = get_hf_token()
     if token:
-        api = HfApi(token=token)
         try:
-            files = api.list_repo_files(repo_id, repo_type="dataset")
+            files = _list_files(repo_id, token)
             json_files = [Path(f).stem for f in files if f.startswith("compare/") and f.endswith(".json")]
             
             # Add file selector in sidebar
@@ -329,22 +520,31 @@ def main():
                 st.error("No evaluation data found!")
                 return
                 
-            # Display schema information
+            # Display schema information. Opt-in: the per-model widgets
+            # are pure reference material and cost O(models) messages per
+            # rerun when rendered unconditionally
             st.sidebar.header("Schema Information")
-            for model_name, schema in schemas.items():
-                with st.sidebar.expander(f"{model_name} Schema"):
-                    st.write("Score Types:", list(schema['score_types']))
-                    st.write("Metadata Fields:", list(schema['metadata_fields']))
-                    st.write("Evaluation Fields:", list(schema['evaluation_fields']))
+            schemas_key = tuple(
+                (model_name, tuple(sorted(schema['score_types'])))
+                for model_name, schema in sorted(schemas.items())
+            )
+            if st.sidebar.checkbox("Show schema information"):
+                st.sidebar.dataframe(_schema_df(schemas_key, schemas))
             
             # Get common score types across all models
-            common_score_types = set.intersection(*[schema['score_types'] for schema in schemas.values()])
+            common_score_types = _common_scores(schemas_key, schemas)
             if not common_score_types:
                 st.error("No common score types found across models!")
                 return
             
             # Create comparison table
-            comparison_df = create_comparison_table(evaluations, common_score_types)
+            comparison_df = cached_comparison_table(
+                repo_id,
+                tuple(sorted(selected_files)),
+                tuple(sorted(common_score_types)),
+                evaluations,
+                token
+            )
             
             # Add question exclusion in sidebar
             st.sidebar.header("Question Filtering")
@@ -356,28 +556,35 @@ def main():
             )
             
             # Filter comparison dataframe for summary statistics and visualizations
-            filtered_df = comparison_df[~comparison_df['question_id'].isin(excluded_questions)]
+            filtered_df = _filter_questions(comparison_df, tuple(excluded_questions))
             
             # Display summary statistics
             st.header("Summary Statistics")
             if excluded_questions:
                 st.info(f"Excluded {len(excluded_questions)} questions from summary statistics")
             
-            # Calculate statistics for each model
+            # Calculate statistics for each model: one vectorized quantile
+            # pass over every score column instead of three pandas calls
+            # per (model, score) pair
+            score_cols = [
+                f"{model_name}_{score_type}"
+                for model_name in evaluations
+                for score_type in common_score_types
+            ]
+            quantiles = filtered_df[score_cols].quantile([0.25, 0.5, 0.75])
+            evaluators = _evaluator_map(tuple(sorted(evaluations)), evaluations)
+
             summary_data = []
-            for model_name in evaluations.keys():
-                # Get evaluator from the first row (it's the same for all rows)
-                evaluator = comparison_df[f"{model_name}_evaluator"].iloc[0]
+            for model_name in evaluations:
                 model_data = {
                     'Model': model_name,
-                    'Evaluator': evaluator
+                    'Evaluator': evaluators[model_name]
                 }
                 for score_type in common_score_types:
-                    col_name = f"{model_name}_{score_type}"
-                    scores = filtered_df[col_name]  # Use filtered data
-                    # Format the statistics as a string
-                    stats_str = f"Q25: {scores.quantile(0.25):.2f} | Median: {scores.median():.2f} | Q75: {scores.quantile(0.75):.2f}"
-                    model_data[score_type.replace('_', ' ').title()] = stats_str
+                    q = quantiles[f"{model_name}_{score_type}"]
+                    model_data[score_type.replace('_', ' ').title()] = (
+                        f"Q25: {q[0.25]:.2f} | Median: {q[0.5]:.2f} | Q75: {q[0.75]:.2f}"
+                    )
                 summary_data.append(model_data)
             
             summary_df = pd.DataFrame(summary_data)
@@ -387,29 +594,31 @@ def main():
             col1, col2 = st.columns(2)
             with col1:
                 # Download summary statistics
-                summary_csv = summary_df.to_csv(index=False)
                 st.download_button(
                     label="Download Summary Statistics",
-                    data=summary_csv,
+                    data=_df_to_csv(summary_df),
                     file_name="summary_statistics.csv",
                     mime="text/csv"
                 )
             
             with col2:
                 # Download full comparison table
-                full_csv = comparison_df.to_csv(index=False)
                 st.download_button(
                     label="Download Full Comparison Table",
-                    data=full_csv,
+                    data=_df_to_csv(comparison_df),
                     file_name="full_comparison.csv",
                     mime="text/csv"
                 )
             
             # Create and display heatmaps for each score type
             st.header("Score Heatmaps")
+            max_rows = st.sidebar.slider(
+                "Max heatmap rows (larger tables are binned)",
+                min_value=100, max_value=2000, value=1000, step=100
+            )
             for score_type in common_score_types:
                 # Use full comparison_df for heatmap to show all questions
-                fig = create_score_heatmap(comparison_df, score_type)
+                fig = create_score_heatmap(comparison_df, score_type, max_rows)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Add histogram for this score type using filtered data